@@ -102,12 +102,12 @@ def analyze_step_file(file_path: str) -> Dict[str, Any]:
         validation = _perform_validation(cm)
         
         # Calculate totals
-        total_volume = sum(p.get('volume', 0) for p in cm.geometric_props.values())
-        total_surface = sum(p.get('surface_area', 0) for p in cm.geometric_props.values())
+        total_volume, total_surface = cm.geometry_totals()
         
         return {
             "file": file_path or "fichier_joint",
             "checksum": cm.calculate_file_checksum(),
+            "checksum_algo": cm.checksum_algo,
             "analyzed_at": datetime.now().isoformat(),
             
             "metadata": {
@@ -121,7 +121,7 @@ def analyze_step_file(file_path: str) -> Dict[str, Any]:
             "bom": {
                 "items": cm.bom,
                 "total_count": len(cm.bom),
-                "max_depth": max([item['level'] for item in cm.bom]) if cm.bom else 0
+                "max_depth": cm.bom_statistics()[1]
             },
             
             "components": {
@@ -139,7 +139,7 @@ def analyze_step_file(file_path: str) -> Dict[str, Any]:
             
             "colors": cm.colors_registry,
             
-            "dependencies": dict(cm.dependency_graph),
+            "dependencies": cm.dependencies_as_dict(),
             
             "validation": validation
         }
@@ -186,11 +186,11 @@ def compare_step_files(file1_path: str, file2_path: str) -> Dict[str, Any]:
         
         # Analyser les interfaces pour les deux versions
         cm1 = ConfigurationManager(resolved_path1, silent=True)
-        cm1.analyze_geometry()
+        cm1.analyze_geometry(with_surface=False)
         interfaces1 = cm1.analyze_interfaces()
         
         cm2 = ConfigurationManager(resolved_path2, silent=True)
-        cm2.analyze_geometry()
+        cm2.analyze_geometry(with_surface=False)
         interfaces2 = cm2.analyze_interfaces()
         
         # Comparer les interfaces
@@ -329,8 +329,7 @@ def extract_geometry(
             return {"components": filtered}
         
         # Calculate totals
-        total_volume = sum(p.get('volume', 0) for p in cm.geometric_props.values())
-        total_surface = sum(p.get('surface_area', 0) for p in cm.geometric_props.values())
+        total_volume, total_surface = cm.geometry_totals()
         
         return {
             "components": cm.geometric_props,
@@ -362,7 +361,7 @@ def validate_step_file(file_path: str) -> Dict[str, Any]:
         
         cm = ConfigurationManager(resolved_path, silent=True)
         cm.build_bom()
-        cm.analyze_geometry()
+        cm.analyze_geometry(with_surface=False)
         
         return _perform_validation(cm)
     except Exception as e:
@@ -397,7 +396,7 @@ def analyze_interfaces(file_path: str) -> Dict[str, Any]:
         
         cm = ConfigurationManager(resolved_path, silent=True)
         cm.build_bom()
-        cm.analyze_geometry()
+        cm.analyze_geometry(with_surface=False)
         interfaces = cm.analyze_interfaces()
         
         # Grouper par type
@@ -472,6 +471,9 @@ def _perform_validation(cm: ConfigurationManager) -> Dict[str, Any]:
     """Effectue les vérifications de validation"""
     checks = []
     
+    # Compteurs de la BOM (maintenus par ConfigurationManager, sans reparcourir la BOM)
+    unnamed_count, max_depth, duplicates = cm.bom_statistics()
+    
     # Check 1: Metadata
     if cm.metadata:
         checks.append({
@@ -487,9 +489,8 @@ def _perform_validation(cm: ConfigurationManager) -> Dict[str, Any]:
         })
     
     # Check 2: Schema
-    valid_schemas = ['CONFIG_CONTROL_DESIGN', 'AUTOMOTIVE_DESIGN', 'AP203', 'AP214']
     schema = cm.metadata.get('schema', '')
-    if any(s in schema for s in valid_schemas):
+    if cm.is_valid_schema(schema):
         checks.append({
             "name": "schema",
             "status": "pass",
@@ -503,7 +504,6 @@ def _perform_validation(cm: ConfigurationManager) -> Dict[str, Any]:
         })
     
     # Check 3: Hierarchy depth
-    max_depth = max([item['level'] for item in cm.bom]) if cm.bom else 0
     if max_depth <= 10:
         checks.append({
             "name": "hierarchy",
@@ -518,12 +518,11 @@ def _perform_validation(cm: ConfigurationManager) -> Dict[str, Any]:
         })
     
     # Check 4: Components named
-    unnamed = [item for item in cm.bom if not item['name'] or item['name'].strip() == '']
-    if unnamed:
+    if unnamed_count:
         checks.append({
             "name": "naming",
             "status": "fail",
-            "message": f"{len(unnamed)} composants sans nom"
+            "message": f"{unnamed_count} composants sans nom"
         })
     else:
         checks.append({
@@ -547,12 +546,6 @@ def _perform_validation(cm: ConfigurationManager) -> Dict[str, Any]:
         })
     
     # Check 6: Duplicate names
-    from collections import defaultdict
-    name_counts = defaultdict(int)
-    for item in cm.bom:
-        name_counts[item['name']] += 1
-    duplicates = {name: count for name, count in name_counts.items() if count > 1}
-    
     if duplicates:
         checks.append({
             "name": "duplicates",
@@ -88,17 +88,19 @@ class BaselineComparator:
             self._log(f"  ✓ Baseline générée pour {step_file}")
             
             # Build baseline data structure
+            now = datetime.now()
             baseline = {
-                'baseline_id': cm.generate_config_id(),
-                'timestamp': datetime.now().isoformat(),
+                'baseline_id': cm.generate_config_id(now),
+                'timestamp': now.isoformat(),
                 'file': step_file,
                 'metadata': cm.metadata,
                 'bom': cm.bom,
                 'component_registry': cm.components_registry,
                 'geometric_properties': cm.geometric_props,
                 'colors': cm.colors_registry,
-                'dependencies': dict(cm.dependency_graph),
-                'checksum': cm.calculate_file_checksum()
+                'dependencies': cm.dependencies_as_dict(),
+                'checksum': cm.calculate_file_checksum(),
+                'checksum_algo': cm.checksum_algo
             }
             
             return baseline
@@ -137,8 +139,10 @@ class BaselineComparator:
         self._log(f"  Fichier: {self.baseline2['file']}")
         self._log(f"  Checksum: {self.baseline2['checksum'][:16]}...")
         
-        # Check if same file
-        if self.baseline1['checksum'] == self.baseline2['checksum']:
+        # Check if same file (checksums comparables seulement avec le même algorithme ;
+        # les baselines antérieures sans 'checksum_algo' sont en SHA-256)
+        same_algo = self.baseline1.get('checksum_algo', 'sha256') == self.baseline2.get('checksum_algo', 'sha256')
+        if same_algo and self.baseline1['checksum'] == self.baseline2['checksum']:
             self._log("\n✓ IDENTIQUE - Les fichiers sont identiques (même checksum)")
             return True
         
@@ -334,64 +338,72 @@ class BaselineComparator:
                  diffs.append(f"Encombrement: {d1} -> {d2}")
 
             # 2. Check Trous (Holes)
-            h1 = props1.get('features_signature', {}).get('holes', [])
-            h2 = props2.get('features_signature', {}).get('holes', [])
+            features1 = props1.get('features_signature', {})
+            features2 = props2.get('features_signature', {})
             
-            # Transformation en SET de tuples (x, y, z, diameter)
-            # Cela élimine automatiquement les doublons exacts (même position, même taille)
-            set1 = set((h['x'], h['y'], h['z'], h['d']) for h in h1)
-            set2 = set((h['x'], h['y'], h['z'], h['d']) for h in h2)
+            # Même empreinte => mêmes trous, pas besoin de comparer en détail
+            hash1 = features1.get('signature_hash')
+            same_holes = hash1 is not None and hash1 == features2.get('signature_hash')
             
-            if set1 != set2:
-                removed = list(set1 - set2)
-                added = list(set2 - set1)
+            if not same_holes:
+                h1 = features1.get('holes', [])
+                h2 = features2.get('holes', [])
                 
-                # Mapping intelligent "Suppression vs Modification"
-                mapped_changes = []
+                # Transformation en SET de tuples (x, y, z, diameter)
+                # Cela élimine automatiquement les doublons exacts (même position, même taille)
+                set1 = set((h['x'], h['y'], h['z'], h['d']) for h in h1)
+                set2 = set((h['x'], h['y'], h['z'], h['d']) for h in h2)
                 
-                # On essaie de lier les éléments supprimés aux éléments ajoutés
-                # Copie de travail pour 'added'
-                work_added = added[:] 
-                
-                for r in removed:
-                    rx, ry, rz, rd = r
-                    found = False
+                if set1 != set2:
+                    removed = list(set1 - set2)
+                    added = list(set2 - set1)
                     
-                    # Recherche d'un trou au même endroit (Tolérance 0.5mm)
-                    for i, a in enumerate(work_added):
-                        ax, ay, az, ad = a
-                        dist = ((rx-ax)**2 + (ry-ay)**2 + (rz-az)**2)**0.5
-                        
-                        if dist < 0.5: # Même position
-                            mapped_changes.append(f"Ø Modifié @({rx},{ry}): {rd} -> {ad}")
-                            work_added.pop(i)
-                            found = True
-                            break
+                    # Mapping intelligent "Suppression vs Modification"
+                    mapped_changes = []
+                    
+                    # On essaie de lier les éléments supprimés aux éléments ajoutés
+                    # Copie de travail pour 'added'
+                    work_added = added[:] 
                     
-                    if not found:
-                        # Recherche d'un trou de même taille déplacé
+                    for r in removed:
+                        rx, ry, rz, rd = r
+                        found = False
+                        
+                        # Recherche d'un trou au même endroit (Tolérance 0.5mm)
                         for i, a in enumerate(work_added):
                             ax, ay, az, ad = a
-                            if rd == ad: # Même diamètre
-                                mapped_changes.append(f"Déplacé (Ø{rd}): vers ({ax},{ay})")
+                            dist = ((rx-ax)**2 + (ry-ay)**2 + (rz-az)**2)**0.5
+                            
+                            if dist < 0.5: # Même position
+                                mapped_changes.append(f"Ø Modifié @({rx},{ry}): {rd} -> {ad}")
                                 work_added.pop(i)
                                 found = True
                                 break
-                                
-                    if not found:
-                        mapped_changes.append(f"Supprimé Ø{rd} @({rx},{ry})")
-                
-                # Ce qui reste dans work_added sont les vrais ajouts
-                for a in work_added:
-                    mapped_changes.append(f"Ajouté Ø{a[3]} @({a[0]},{a[1]})")
-                
-                if mapped_changes:
-                    # On limite l'affichage à 5 messages pour ne pas saturer le rapport si gros assemblage
-                    if len(mapped_changes) > 10:
-                        preview = " | ".join(mapped_changes[:5])
-                        diffs.append(f"{preview} ... (+{len(mapped_changes)-5} autres)")
-                    else:
-                        diffs.append(" | ".join(mapped_changes))
+                        
+                        if not found:
+                            # Recherche d'un trou de même taille déplacé
+                            for i, a in enumerate(work_added):
+                                ax, ay, az, ad = a
+                                if rd == ad: # Même diamètre
+                                    mapped_changes.append(f"Déplacé (Ø{rd}): vers ({ax},{ay})")
+                                    work_added.pop(i)
+                                    found = True
+                                    break
+                                    
+                        if not found:
+                            mapped_changes.append(f"Supprimé Ø{rd} @({rx},{ry})")
+                    
+                    # Ce qui reste dans work_added sont les vrais ajouts
+                    for a in work_added:
+                        mapped_changes.append(f"Ajouté Ø{a[3]} @({a[0]},{a[1]})")
+                    
+                    if mapped_changes:
+                        # On limite l'affichage à 5 messages pour ne pas saturer le rapport si gros assemblage
+                        if len(mapped_changes) > 10:
+                            preview = " | ".join(mapped_changes[:5])
+                            diffs.append(f"{preview} ... (+{len(mapped_changes)-5} autres)")
+                        else:
+                            diffs.append(" | ".join(mapped_changes))
 
             if diffs:
                 change_desc = f"{name}: " + " | ".join(diffs)
@@ -510,12 +522,13 @@ class BaselineComparator:
         elif self.changes.get('components_added'): impact_score = "MAJOR_BOM"
 
         # Construction du rapport final
-        report_filename = f"comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        now = datetime.now()
+        report_filename = f"comparison_report_{now.strftime('%Y%m%d_%H%M%S')}.json"
         
         report_data = {
             'baseline1': self.baseline1.get('baseline_id', 'Unknown'),
             'baseline2': self.baseline2.get('baseline_id', 'Unknown'),
-            'comparison_date': datetime.now().isoformat(),
+            'comparison_date': now.isoformat(),
             'impact_assessment': impact_score,
             'summary': {
                 'total_changes': total_changes,
@@ -4,6 +4,8 @@ Configuration Management Analyzer for STEP Files
 Analyse de gestion de configuration pour objets industriels
 """
 import os
+import mmap
+from pathlib import Path
 from OCC.Core.BRepBndLib import brepbndlib
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_COMPOUND
@@ -16,42 +18,440 @@ from OCC.Core.XCAFDoc import XCAFDoc_DocumentTool
 from OCC.Core.TopLoc import TopLoc_Location
 from OCC.Core.BRepGProp import brepgprop
 from OCC.Core.GProp import GProp_GProps
-from OCC.Core.Quantity import Quantity_Color
+from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
 from OCC.Core.TopoDS import TopoDS_Shape
 from OCC.Core.TopExp import TopExp_Explorer
 from OCC.Core.TopAbs import TopAbs_FACE
 from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
 from OCC.Core.GeomAbs import GeomAbs_Cylinder, GeomAbs_Plane
+import numpy as np
 import re
 import json
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict, namedtuple
 import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+from itertools import repeat
+import threading
+from operator import itemgetter
+import functools
+import io
+import sys
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur le module json standard
+    orjson = None
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy est optionnel : repli sur un balayage NumPy
+    cKDTree = None
+
+try:
+    import re2
+except ImportError:  # google-re2 est optionnel : repli sur le module re
+    re2 = None
+
+try:
+    from numba import njit
+except ImportError:  # numba est optionnel : repli sur la version NumPy
+    njit = None
+
+try:
+    import blake3
+except ImportError:  # blake3 est optionnel : repli sur SHA-256
+    blake3 = None
+
+# Motifs du header STEP, appliqués directement sur les octets du fichier
+_FILE_DESC_RE = re.compile(rb"FILE_DESCRIPTION\('([^']+)'")
+_FILE_NAME_RE = re.compile(rb"FILE_NAME\('([^']+)','([^']+)','([^']*)'")
+_FILE_SCHEMA_RE = re.compile(rb"FILE_SCHEMA\(\('([^']+)'\)\)")
+# Le scan PRODUCT parcourt toute la section DATA : moteur DFA (RE2) si disponible
+_PRODUCT_RE = (re2 or re).compile(rb"#(\d+)=PRODUCT\('([^']+)','([^']*)'")
+# FILE_DESCRIPTION / FILE_NAME / FILE_SCHEMA se trouvent dans la section HEADER,
+# terminée par le début de la section DATA (limite de repli si absente)
+_HEADER_SCAN_SIZE = 65536
+# Taille des blocs lus pour le checksum du fichier
+_CHECKSUM_CHUNK = 8 * 1024 * 1024
+# Algorithme de checksum par défaut : BLAKE3 (multi-thread, SIMD) si disponible
+_DEFAULT_CHECKSUM_ALGO = 'blake3' if blake3 is not None else 'sha256'
+
+
+# Colonnes numériques de geometric_props (une ligne par composant)
+_GEOMETRY_DTYPE = np.dtype([
+    ('volume', np.float64),
+    ('surface_area', np.float64),
+    ('cog', np.float64, (3,)),
+    ('dims', np.float64, (3,)),
+    ('extent', np.float64, (6,)),  # [xmin, ymin, zmin, xmax, ymax, zmax], NaN si absente
+    ('n_holes', np.int32),
+    ('n_planes', np.int32)
+])
+
+
+# Arête du graphe de dépendances : composant enfant référencé par un assemblage
+DependencyChild = namedtuple('DependencyChild', 'entry name')
+
+
+def _decode(raw):
+    """Décode une capture regex (octets) en texte"""
+    return raw.decode('utf-8', 'ignore')
+
+
+def _write_json(filename, data):
+    """Écrit un document JSON indenté (orjson si disponible)
+    
+    Le repli json.dump encode par morceaux directement dans le fichier :
+    aucune copie sérialisée complète n'est gardée en mémoire.
+    Les valeurs non natives (datetime, scalaires NumPy...) sont écrites via str().
+    """
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(
+                data, default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
+    else:
+        # json.dump écrit token par token : tampon de 1 Mio pour limiter les write()
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+
+
+# Champs d'une ligne de BOM dans l'ordre des colonnes du CSV
+_BOM_CSV_ROW = itemgetter('position', 'level', 'quantity', 'name', 'type', 'label_entry')
+
+
+def _log_phase(method):
+    """Décorateur : vide le tampon de log à la fin d'une phase d'analyse"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._flush_log()
+    return wrapper
+
+
+# Écart maximal entre boîtes englobantes (mm) pour considérer deux composants en contact
+_CONTACT_GAP = 0.1
+
+# Bnd_Box de travail, une par thread (réutilisée d'un composant à l'autre)
+_bbox_scratch = threading.local()
+
+# pythonocc-core >= 7.4.1 sérialise les TopoDS_Shape (BRep) pour pickle :
+# condition pour répartir l'analyse sur des processus
+_SHAPES_PICKLABLE = hasattr(TopoDS_Shape, '__setstate__')
+
+
+def _bounding_box(shape):
+    """Calcule la boîte englobante pour l'analyse d'encombrement (Clash Detection)"""
+    bbox = getattr(_bbox_scratch, 'bbox', None)
+    if bbox is None:
+        bbox = _bbox_scratch.bbox = Bnd_Box()
+    else:
+        bbox.SetVoid()
+    brepbndlib.Add(shape, bbox)
+    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    return {
+        'dims': [round(xmax-xmin, 2), round(ymax-ymin, 2), round(zmax-zmin, 2)],
+        'volume_bbox': round((xmax-xmin)*(ymax-ymin)*(zmax-zmin), 2),
+        'extent': [round(v, 3) for v in (xmin, ymin, zmin, xmax, ymax, zmax)]
+    }
+
+
+def _aabb_separation(extent1, extent2):
+    """Séparation signée entre deux boîtes alignées sur les axes
+    
+    Args:
+        extent1, extent2: [xmin, ymin, zmin, xmax, ymax, zmax]
+    
+    Returns:
+        Plus grand écart par axe : > 0 si les boîtes sont disjointes,
+        <= 0 si elles se touchent ou se chevauchent
+    """
+    return max(
+        extent1[0] - extent2[3], extent2[0] - extent1[3],
+        extent1[1] - extent2[4], extent2[1] - extent1[4],
+        extent1[2] - extent2[5], extent2[2] - extent1[5]
+    )
+
+
+def _geometric_features(shape, silent=True):
+    """
+    Extrait les signatures topologiques avec localisation spatiale.
+    Retourne : { 'holes': [{'d': 3.0, 'x': 10.0, 'y': 5.0, ...}], 'planar_faces': n,
+                 'signature_hash': empreinte blake2b des trous triés }
+    """
+    features = {
+        'holes': [], 
+        'planar_faces_count': 0
+    }
+    hole_rows = []
+    planar_faces = 0
+    
+    try:
+        explorer = TopExp_Explorer(shape, TopAbs_FACE)
+        # Un seul adaptateur, réinitialisé sur chaque face
+        surf = BRepAdaptor_Surface()
+        while explorer.More():
+            # Le try englobe la boucle interne : en cas d'erreur on saute
+            # seulement la face fautive puis on reprend le parcours
+            try:
+                while explorer.More():
+                    surf.Initialize(explorer.Current(), True)
+                    type_surf = surf.GetType()
+                    
+                    if type_surf == GeomAbs_Cylinder:
+                        cyl = surf.Cylinder()
+                        radius = cyl.Radius()
+                        loc = cyl.Location()
+                        
+                        # On stocke le Diamètre ET la Position (arrondis pour la stabilité)
+                        # C'est la clé de la gestion d'assemblage : savoir OÙ est le trou.
+                        hole_rows.append((
+                            round(radius * 2.0, 3), # Diamètre
+                            round(loc.X(), 1),
+                            round(loc.Y(), 1),
+                            round(loc.Z(), 1)
+                        ))
+                    
+                    elif type_surf == GeomAbs_Plane:
+                        planar_faces += 1
+                    
+                    explorer.Next()
+            except Exception as e:
+                # Skip face if error, but continue processing
+                if not silent:
+                    print(f"    Warning: Error processing face: {e}")
+                explorer.Next()
+        
+        features['planar_faces_count'] = planar_faces
+        
+        # Tri pour garantir l'ordre déterministe (diamètre puis position X, Y, Z)
+        # + 0.0 ramène -0.0 à 0.0 : même tri et mêmes octets pour l'empreinte
+        holes = np.array(hole_rows, dtype=np.float64).reshape(-1, 4) + 0.0
+        holes = holes[np.lexsort(holes.T[::-1])]
+        features['holes'] = [
+            {'d': d, 'x': x, 'y': y, 'z': z} for d, x, y, z in holes.tolist()
+        ]
+        # Empreinte des trous : deux signatures identiques ont la même empreinte
+        features['signature_hash'] = hashlib.blake2b(holes.tobytes(), digest_size=16).hexdigest()
+    except Exception as e:
+        if not silent:
+            print(f"    Warning: Error extracting features: {e}")
+        
+    return features
+
+
+def _shape_props(shape, with_surface=True, silent=True):
+    """Calcule les propriétés géométriques d'une forme
+    
+    Fonction de module (picklable) : exécutée dans un thread ou un processus.
+    
+    Returns:
+        Tuple (propriétés ou None, erreur topologie ou None, erreur ou None)
+    """
+    try:
+        # 1. Volume
+        props = GProp_GProps()
+        brepgprop.VolumeProperties(shape, props)
+        volume = props.Mass()
+        
+        # 2. Surface area (seulement si demandée)
+        surface_area = None
+        if with_surface:
+            props_surface = GProp_GProps()
+            brepgprop.SurfaceProperties(shape, props_surface)
+            surface_area = props_surface.Mass()
+        
+        # 3. Center of gravity
+        cog = props.CentreOfMass()
+        
+        # 4. Bounding Box
+        bbox_data = _bounding_box(shape)
+        
+        # 5. Topologie (Trous & Faces)
+        features = {}
+        topo_error = None
+        try:
+            exp = TopExp_Explorer(shape, TopAbs_FACE)
+            if exp.More():
+                features = _geometric_features(shape, silent)
+        except Exception as e:
+            topo_error = str(e)
+        
+        props_data = {
+            'volume': volume,
+            'center_of_gravity': [cog.X(), cog.Y(), cog.Z()],
+            'bbox': bbox_data,
+            'features_signature': features
+        }
+        if surface_area is not None:
+            props_data['surface_area'] = surface_area
+        
+        return props_data, topo_error, None
+    
+    except Exception as e:
+        return None, None, str(e)
+
+
+def _candidate_pairs(cogs, radii):
+    """Énumère les paires de composants suffisamment proches pour interagir
+    
+    Une paire (i, j) est retenue si la distance entre centres ne dépasse pas
+    d <= 2*max(r_i, r_j) : j est dans la boule de rayon 2*r_i autour de i,
+    ou i dans celle de rayon 2*r_j autour de j. Les rayons sont choisis par
+    l'appelant pour couvrir tout ce qu'accepte _analyze_component_pair.
+    
+    Args:
+        cogs: tableau (N, 3) des centres
+        radii: tableau (N,) des rayons d'influence
+    
+    Returns:
+        Liste triée de tuples (i, j) avec i < j
+    """
+    n = len(cogs)
+    if n < 2:
+        return []
+    
+    # Légère marge pour les erreurs d'arrondi
+    reach = 2.0 * radii + 1e-6
+    
+    if cKDTree is not None:
+        tree = cKDTree(cogs)
+        pairs = set()
+        for i, neighbours in enumerate(tree.query_ball_point(cogs, reach)):
+            for j in neighbours:
+                if i < j:
+                    pairs.add((i, j))
+                elif j < i:
+                    pairs.add((j, i))
+        return sorted(pairs)
+    
+    pairs = []
+    for i in range(n - 1):
+        d2 = ((cogs[i+1:] - cogs[i]) ** 2).sum(axis=1)
+        limit = np.maximum(reach[i+1:], reach[i])
+        for k in np.nonzero(d2 <= limit * limit)[0]:
+            pairs.append((i, i + 1 + int(k)))
+    return pairs
+
+
+def _aligned_holes_kernel(h1, h2, tol):
+    """Appariement des trous alignés sur tableaux (N, 4) [d, x, y, z]
+    
+    Même logique que ConfigurationManager._find_aligned_holes, en boucles
+    scalaires pour la compilation Numba (pas de tableaux temporaires).
+    
+    Returns:
+        Tableau (K, 2) d'indices (i, j) des paires retenues
+    """
+    out = np.empty((h1.shape[0], 2), dtype=np.int32)
+    count = 0
+    for i in range(h1.shape[0]):
+        for j in range(h2.shape[0]):
+            if abs(h1[i, 0] - h2[j, 0]) > 0.1:
+                continue
+            
+            dx = abs(h1[i, 1] - h2[j, 1])
+            dy = abs(h1[i, 2] - h2[j, 2])
+            dz = abs(h1[i, 3] - h2[j, 3])
+            
+            aligned_axes = 0
+            if dx < tol:
+                aligned_axes += 1
+            if dy < tol:
+                aligned_axes += 1
+            if dz < tol:
+                aligned_axes += 1
+            
+            if aligned_axes >= 2 and (dx*dx + dy*dy + dz*dz) ** 0.5 < tol * 2:
+                out[count, 0] = i
+                out[count, 1] = j
+                count += 1
+                break
+    return out[:count]
+
+
+_aligned_holes_nb = njit(cache=True)(_aligned_holes_kernel) if njit is not None else None
 
 
 class ConfigurationManager:
     """Gestionnaire de configuration pour produits industriels au format STEP"""
     
-    def __init__(self, filename, silent=False):
+    # Schémas STEP reconnus, comparés comme suites entières délimitées par '_'
+    # ou la ponctuation (pas de correspondance partielle : 'AP2038' est refusé)
+    VALID_SCHEMAS = frozenset({'CONFIG_CONTROL_DESIGN', 'AUTOMOTIVE_DESIGN', 'AP203', 'AP214'})
+    _SCHEMA_ID_RE = re.compile(
+        r'(?<![A-Z0-9])(?:' + '|'.join(sorted(VALID_SCHEMAS, key=len, reverse=True)) + r')(?![A-Z0-9])'
+    )
+    
+    def __init__(self, filename, silent=False, checksum_algo=None):
         """Initialize avec un fichier STEP
         
         Args:
             filename: chemin vers le fichier STEP
             silent: si True, désactive tous les prints (pour MCP)
+            checksum_algo: 'blake3' ou 'sha256' (défaut : blake3 si installé)
         """
         self.fname = filename
         self.silent = silent
+        # Partie fixe de l'ID de configuration (le nom de fichier ne change pas)
+        self._fname_hash8 = hashlib.md5(filename.encode()).hexdigest()[:8]
+        if checksum_algo is None or (checksum_algo == 'blake3' and blake3 is None):
+            checksum_algo = _DEFAULT_CHECKSUM_ALGO
+        if checksum_algo not in ('blake3', 'sha256'):
+            raise ValueError(f"Algorithme de checksum non supporté: {checksum_algo}")
+        self.checksum_algo = checksum_algo
         self.doc = None
         self.shape_tool = None
         self.color_tool = None
-        self.bom = []  # Bill of Materials
+        self.bom = []  # Bill of Materials (dicts : format exposé par MCP et les baselines)
+        # Hiérarchie de la BOM : index du parent de chaque ligne (-1 pour la racine),
+        # dernière ligne par entry et chemins déjà construits
+        self._bom_parent = []
+        self._bom_stack = []
+        self._bom_index = {}
+        self._path_cache = {}
+        # Nom de la première ligne de BOM de chaque entry (get_name_from_entry)
+        self._entry_to_name = {}
+        # Statistiques de validation tenues à jour pendant la construction
+        self._unnamed_count = 0
+        self._max_level = 0
+        self._name_counter = Counter()
         self.components_registry = {}  # Registre des composants
         self.metadata = {}
         self.geometric_props = {}
         self.dependency_graph = defaultdict(list)
-        self.colors_registry = {}
+        # Couleurs en colonnes : entries, noms et tableau (N, 3) uint8 des RGB
+        # (colors_registry en donne la vue dict sérialisable)
+        self.color_entries = []
+        self.color_names = []
+        self.color_rgb = np.empty((0, 3), dtype=np.uint8)
         self.materials_registry = {}
         self.interfaces = []  # Interfaces entre composants
+        self._holes_arrays = {}  # entry -> tableau (N, 4) [d, x, y, z] des trous
+        # Vue en colonnes de geometric_props (même ordre), pour les calculs vectorisés
+        self._entries = []
+        self._props_table = np.zeros(0, dtype=_GEOMETRY_DTYPE)
+        self._bbox_max = np.empty(0, dtype=np.float64)
+        # Centres et rayons du pré-filtrage spatial des paires (voir _build_geometry_arrays)
+        self._pair_centres = np.empty((0, 3), dtype=np.float64)
+        self._pair_radii = np.empty(0, dtype=np.float64)
+        self._log_buf = io.StringIO()  # Tampon de log, vidé à chaque phase
+        
+        # Handles OCC réutilisés d'une boucle à l'autre (vidés avant usage)
+        self._scratch_seq = TDF_LabelSequence()
+        # Mapping entry -> label, construit une seule fois (voir _ensure_label_map)
+        self._label_seq = None
+        self._label_map = None
+        self._scratch_comps = TDF_LabelSequence()
+        self._scratch_color = Quantity_Color()
+        # Caches par entry des requêtes OCC répétées sur un même label
+        self._is_assy = {}
+        self._name_cache = {}
         
         # Load file
         self.load_file()
@@ -59,8 +459,29 @@ class ConfigurationManager:
     def _log(self, message):
         """Log a message if not in silent mode"""
         if not self.silent:
-            print(message)
+            self._log_buf.write(message)
+            self._log_buf.write('\n')
+    
+    def _log_lazy(self, make_message):
+        """Log un message construit seulement hors mode silencieux
         
+        Args:
+            make_message: callable sans argument retournant le message
+        """
+        if not self.silent:
+            self._log_buf.write(make_message())
+            self._log_buf.write('\n')
+    
+    def _flush_log(self):
+        """Écrit en une fois les messages accumulés sur stdout"""
+        text = self._log_buf.getvalue()
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            self._log_buf.seek(0)
+            self._log_buf.truncate()
+        
+    @_log_phase
     def load_file(self):
         """Charge le fichier STEP"""
         # Validate file exists
@@ -103,36 +524,88 @@ class ConfigurationManager:
     def extract_file_metadata(self):
         """Extract metadata from STEP file header"""
         try:
-            with open(self.fname, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # FILE_DESCRIPTION
-            file_desc = re.search(r"FILE_DESCRIPTION\('([^']+)'", content)
-            if file_desc:
-                self.metadata['description'] = file_desc.group(1)
+            # Produits : lus dans le modèle XCAF déjà construit par le Transfer,
+            # le scan regex de la section DATA n'est qu'un repli
+            products = self._xcaf_products()
+            if products:
+                self.metadata['products'] = products
             
-            # FILE_NAME
-            file_name_match = re.search(r"FILE_NAME\('([^']+)','([^']+)','([^']*)'", content)
-            if file_name_match:
-                self.metadata['filename'] = file_name_match.group(1)
-                self.metadata['timestamp'] = file_name_match.group(2)
-                self.metadata['author'] = file_name_match.group(3) if file_name_match.group(3) else "Unknown"
-            
-            # FILE_SCHEMA
-            schema = re.search(r"FILE_SCHEMA\(\('([^']+)'\)\)", content)
-            if schema:
-                self.metadata['schema'] = schema.group(1)
-            
-            # PRODUCT entries
-            products = re.findall(r"#(\d+)=PRODUCT\('([^']+)','([^']*)'", content)
-            self.metadata['products'] = [
-                {'id': p[0], 'name': p[1], 'description': p[2]} 
-                for p in products
-            ]
+            # Fichier projeté en mémoire : pas de copie, seules les captures sont décodées
+            with open(self.fname, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                self._extract_metadata_from(content, scan_products=not products)
             
         except Exception as e:
             self._log(f"Warning: Metadata extraction error: {e}")
     
+    def _xcaf_products(self):
+        """Liste des produits (formes de premier niveau) du document XCAF
+        
+        Returns:
+            Liste de dicts {'id', 'name', 'description'} (id = entry du label),
+            vide si le document n'est pas chargé
+        """
+        if self.shape_tool is None:
+            return []
+        
+        labels = self._scratch_seq
+        labels.Clear()
+        self.shape_tool.GetShapes(labels)
+        
+        products = []
+        for i in range(labels.Length()):
+            label = labels.Value(i+1)
+            if label.IsNull():
+                continue
+            entry = self.get_entry(label)
+            products.append({'id': entry, 'name': self._label_name(label, entry), 'description': ''})
+        return products
+    
+    def _extract_metadata_from(self, content, scan_products=True):
+        """Remplit self.metadata à partir du contenu brut (octets) du fichier STEP
+        
+        Args:
+            content: contenu du fichier (bytes ou mmap)
+            scan_products: si False, les entités PRODUCT ne sont pas recherchées
+        """
+        # Borner les recherches : HEADER avant 'DATA;', entités PRODUCT après
+        data_off = content.find(b'DATA;')
+        if data_off < 0:
+            header_end = min(len(content), _HEADER_SCAN_SIZE)
+            data_off = 0
+        else:
+            header_end = data_off
+        data_end = content.rfind(b'ENDSEC;', data_off)
+        if data_end < 0:
+            data_end = len(content)
+        
+        # FILE_DESCRIPTION
+        file_desc = _FILE_DESC_RE.search(content, 0, header_end)
+        if file_desc:
+            self.metadata['description'] = _decode(file_desc.group(1))
+        
+        # FILE_NAME
+        file_name_match = _FILE_NAME_RE.search(content, 0, header_end)
+        if file_name_match:
+            self.metadata['filename'] = _decode(file_name_match.group(1))
+            self.metadata['timestamp'] = _decode(file_name_match.group(2))
+            self.metadata['author'] = _decode(file_name_match.group(3)) if file_name_match.group(3) else "Unknown"
+        
+        # FILE_SCHEMA
+        schema = _FILE_SCHEMA_RE.search(content, 0, header_end)
+        if schema:
+            self.metadata['schema'] = _decode(schema.group(1))
+        
+        # PRODUCT entries (section DATA uniquement)
+        if not scan_products:
+            return
+        products = [m.groups() for m in _PRODUCT_RE.finditer(content, data_off, data_end)]
+        self.metadata['products'] = [
+            {'id': _decode(p[0]), 'name': _decode(p[1]), 'description': _decode(p[2])} 
+            for p in products
+        ]
+    
+    @_log_phase
     def analyze_complete(self):
         """Analyse complète de gestion de configuration"""
         self._log("="*80)
@@ -163,6 +636,7 @@ class ConfigurationManager:
         # 7. Validation checks
         self.perform_validation_checks()
         
+    @_log_phase
     def print_product_info(self):
         """Affiche les informations produit"""
         self._log("\n" + "="*80)
@@ -182,6 +656,7 @@ class ConfigurationManager:
                     if prod['description']:
                         self._log(f"      Description: {prod['description']}")
     
+    @_log_phase
     def build_bom(self):
         """Construit la nomenclature (Bill of Materials)"""
         self._log("\n" + "="*80)
@@ -196,24 +671,19 @@ class ConfigurationManager:
             return
         
         rootlabel = labels.Value(1)
+        root_entry = self.get_entry(rootlabel)
         
-        if self.shape_tool.IsAssembly(rootlabel):
+        if self._is_assembly(rootlabel, root_entry):
             self.bom_level = 0
             self.bom_item_number = 1
             self._log(f"\n  {'Pos':<6} {'Niveau':<8} {'Qté':<6} {'Désignation':<40} {'Référence':<15}")
             self._log("  " + "-"*75)
             
-            root_name = rootlabel.GetLabelName()
+            root_name = self._label_name(rootlabel, root_entry)
             self._log(f"  {self.bom_item_number:<6} {self.bom_level:<8} {1:<6} {root_name:<40}")
             
-            self.bom.append({
-                'position': self.bom_item_number,
-                'level': self.bom_level,
-                'quantity': 1,
-                'name': root_name,
-                'label_entry': self.get_entry(rootlabel),
-                'type': 'Assembly'
-            })
+            self._add_bom_item(self.bom_item_number, self.bom_level, root_name,
+                               root_entry, 'Assembly')
             
             self.bom_item_number += 1
             
@@ -240,22 +710,15 @@ class ConfigurationManager:
             is_ref = self.shape_tool.GetReferredShape(c_label, ref_label)
             
             if is_ref and not ref_label.IsNull():
-                ref_name = ref_label.GetLabelName()
                 ref_entry = self.get_entry(ref_label)
+                ref_name = self._label_name(ref_label, ref_entry)
                 
-                is_assy = self.shape_tool.IsAssembly(ref_label)
+                is_assy = self._is_assembly(ref_label, ref_entry)
                 comp_type = "Assembly" if is_assy else "Part"
                 
-                self._log(f"  {self.bom_item_number:<6} {level:<8} {1:<6} {indent}{ref_name:<40}")
+                self._log_lazy(lambda: f"  {self.bom_item_number:<6} {level:<8} {1:<6} {indent}{ref_name:<40}")
                 
-                self.bom.append({
-                    'position': self.bom_item_number,
-                    'level': level,
-                    'quantity': 1,
-                    'name': ref_name,
-                    'label_entry': ref_entry,
-                    'type': comp_type
-                })
+                self._add_bom_item(self.bom_item_number, level, ref_name, ref_entry, comp_type)
                 
                 # Store in registry
                 if ref_entry not in self.components_registry:
@@ -274,14 +737,50 @@ class ConfigurationManager:
                     if ref_comps.Length() > 0:
                         self.process_bom_components(ref_comps, level + 1)
     
+    def _add_bom_item(self, position, level, name, entry, comp_type):
+        """Ajoute une ligne à la BOM"""
+        self.bom.append({
+            'position': position,
+            'level': level,
+            'quantity': 1,
+            'name': name,
+            'label_entry': entry,
+            'type': comp_type
+        })
+        
+        # Parent = ligne précédente la plus proche de niveau inférieur
+        bom = self.bom
+        index = len(bom) - 1
+        stack = self._bom_stack
+        while stack and bom[stack[-1]]['level'] >= level:
+            stack.pop()
+        self._bom_parent.append(stack[-1] if stack else -1)
+        stack.append(index)
+        self._bom_index[entry] = index
+        self._entry_to_name.setdefault(entry, name)
+        
+        if not name or name.strip() == '':
+            self._unnamed_count += 1
+        if level > self._max_level:
+            self._max_level = level
+        self._name_counter[name] += 1
+    
     def count_component_instances(self):
         """Compte les instances de chaque composant"""
         self._log("\n  Comptage des composants:")
         for comp_name, data in sorted(self.components_registry.items()):
             self._log(f"    • {data['name']}: {len(data['instances'])} instance(s)")
 
-    def analyze_geometry(self):
-        """Analyse géométrique complète avec granularité au niveau composant"""
+    @_log_phase
+    def analyze_geometry(self, with_surface=True, processes=False):
+        """Analyse géométrique complète avec granularité au niveau composant
+        
+        Args:
+            with_surface: si False, la surface (intégration sur toutes les faces)
+                          n'est pas calculée et 'surface_area' est omise
+            processes: si True, répartit les calculs des pièces sur des processus
+                       plutôt que des threads (formes transmises sérialisées en BRep)
+        """
         self._log("\n" + "="*80)
         self._log("3. ANALYSE GÉOMÉTRIQUE & SPATIALE (Niveau Composant)")
         self._log("="*80)
@@ -298,171 +797,228 @@ class ConfigurationManager:
         self._log("  " + "-"*90)
         
         # Analyser chaque composant de la BOM individuellement
-        labels = TDF_LabelSequence()
-        self.shape_tool.GetShapes(labels)
-        
-        # Créer un mapping entry -> label pour accès rapide
-        label_map = {}
-        for i in range(labels.Length()):
-            label = labels.Value(i+1)
-            if not label.IsNull():
-                entry = self.get_entry(label)
-                label_map[entry] = label
+        label_map = self._ensure_label_map()
+        
+        # Collecter les composants à analyser (un seul passage par entry).
+        # La BOM énumère déjà récursivement chaque composant référencé (racine,
+        # sous-assemblages et pièces) : pas besoin de redescendre dans les assemblages.
+        tasks = []
+        # Composants déjà analysés ; avec with_surface, ceux calculés sans la surface
+        # (ex. appel automatique par analyze_interfaces) sont refaits
+        seen = {
+            entry for entry, props in self.geometric_props.items()
+            if not with_surface or 'surface_area' in props
+        }
         
-        # Parcourir la BOM et analyser chaque composant
         for bom_item in self.bom:
             entry = bom_item['label_entry']
-            name = bom_item['name']
-            is_root = (bom_item['level'] == 0)  # Détecter l'assemblage racine
+            if entry in seen:
+                continue
+            seen.add(entry)
             
             # Récupérer le label correspondant
-            if entry not in label_map:
+            label = label_map.get(entry)
+            if label is not None:
+                tasks.append((label, entry))
+        
+        # Les calculs OCC (volume, bbox, topologie) sont indépendants par composant :
+        # on les répartit sur un pool de threads (ou de processus, qui ne partagent
+        # pas le GIL), puis on enregistre en série pour conserver l'ordre de la BOM.
+        results = None
+        if processes and _SHAPES_PICKLABLE and len(tasks) > 1:
+            try:
+                results = self._analyze_in_processes(tasks, with_surface)
+            except Exception as e:  # spawn, pickle ou worker en échec : tout est refait en threads
+                self._log(f"  Warning: pool de processus indisponible ({e}), repli sur les threads")
+        
+        if results is None:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(self._analyze_one, tasks, repeat(with_surface)))
+        
+        for entry, simple_name, props, warning in results:
+            if warning and not self.silent:
+                self._log(warning)
+            if props is None:
                 continue
-                
-            label = label_map[entry]
             
-            # Pour les assemblages, on récupère aussi les composants référencés
-            if self.shape_tool.IsAssembly(label):
-                # Analyser l'assemblage lui-même si c'est la racine
-                if is_root:
-                    self._analyze_single_component(label, is_root=True)
-                
-                # Pour un assemblage, analyser les sous-composants
-                comps = TDF_LabelSequence()
-                self.shape_tool.GetComponents(label, comps, False)
-                
-                for j in range(comps.Length()):
-                    c_label = comps.Value(j+1)
-                    if c_label.IsNull():
-                        continue
-                    
-                    ref_label = TDF_Label()
-                    if self.shape_tool.GetReferredShape(c_label, ref_label) and not ref_label.IsNull():
-                        # Analyser le composant référencé
-                        self._analyze_single_component(ref_label)
-            else:
-                # Composant simple (part)
-                self._analyze_single_component(label)
+            previous = self.geometric_props.get(entry)
+            if previous is not None:
+                # Ré-analyse avec la surface : garder nom unique et chemin déjà posés,
+                # et reconstruire la table numérique (mêmes entries, valeurs changées)
+                props = {**previous, **props}
+                self._entries = []
+            self.geometric_props[entry] = props
+            
+            if self.silent:
+                continue
+            bbox_dims = props['bbox']['dims']
+            bbox_str = f"{bbox_dims[0]}x{bbox_dims[1]}x{bbox_dims[2]}"
+            holes_summary = ""
+            if props['features_signature'].get('holes'):
+                count = len(props['features_signature']['holes'])
+                holes_summary = f"{count} trous"
+            self._log(f"  {simple_name:<30} {bbox_str:<25} {holes_summary}")
         
         self._log(f"\n  Total analysé: {len(self.geometric_props)} composants")
         
         # Ajouter les noms uniques pour gérer les doublons
         self.add_unique_names_to_geometry()
+        
+        self._build_geometry_arrays()
     
-    def _analyze_single_component(self, label, is_root=False):
-        """Analyse un seul composant et stocke ses propriétés
+    def _build_geometry_arrays(self):
+        """Construit la table numérique des propriétés géométriques
         
-        Args:
-            label: Label du composant à analyser
-            is_root: True si c'est l'assemblage racine
+        Une ligne par entrée de geometric_props (même ordre que self._entries),
+        plus la plus grande dimension de bbox et les centres / rayons du
+        pré-filtrage spatial utilisés par l'analyse des interfaces.
         """
-        entry = self.get_entry(label)
+        self._entries = list(self.geometric_props.keys())
+        table = np.zeros(len(self._entries), dtype=_GEOMETRY_DTYPE)
+        
+        for row, props in zip(table, self.geometric_props.values()):
+            features = props.get('features_signature', {})
+            row['volume'] = props.get('volume', 0)
+            row['surface_area'] = props.get('surface_area', 0)
+            row['cog'] = props.get('center_of_gravity', [0, 0, 0])
+            row['dims'] = props.get('bbox', {}).get('dims', [0, 0, 0])
+            row['extent'] = props.get('bbox', {}).get('extent') or [np.nan] * 6
+            row['n_holes'] = len(features.get('holes', []))
+            row['n_planes'] = features.get('planar_faces_count', 0)
+        
+        self._props_table = table
+        self._bbox_max = table['dims'].max(axis=1) if len(table) else np.empty(0, dtype=np.float64)
+        
+        extent = table['extent']
+        if len(table) and not np.isnan(extent).any():
+            # Test AABB : écart par axe <= M = max(r_i, r_j), donc entre centres de
+            # bbox d <= hd_i + hd_j + sqrt(3)*M (hd : demi-diagonale), couvert
+            # par d <= 2*max(R_i, R_j) avec R = hd + sqrt(3)*r
+            lower, upper = extent[:, :3], extent[:, 3:]
+            half_diag = 0.5 * np.linalg.norm(upper - lower, axis=1)
+            self._pair_centres = np.ascontiguousarray(0.5 * (lower + upper))
+            self._pair_radii = half_diag + np.sqrt(3.0) * self._bbox_max
+        else:
+            # Repli sans extent (baselines anciennes, toutes analysées ensemble) :
+            # distance entre centres de gravité d <= 2*max(r_i, r_j)
+            self._pair_centres = np.ascontiguousarray(table['cog'])
+            self._pair_radii = self._bbox_max
+    
+    def _ensure_geometry_arrays(self):
+        """Reconstruit la table numérique si geometric_props a changé"""
+        if len(self._entries) != len(self.geometric_props) or \
+                self._entries != list(self.geometric_props.keys()):
+            self._build_geometry_arrays()
+    
+    @classmethod
+    def is_valid_schema(cls, schema):
+        """Vérifie que le schéma STEP contient un identifiant reconnu
         
-        # Éviter de réanalyser le même composant
-        if entry in self.geometric_props:
-            return
+        Un identifiant peut être suivi ou précédé d'autres segments séparés par '_'
+        (ex. 'AUTOMOTIVE_DESIGN_CC2', 'AP203_CONFIGURATION_CONTROLLED_3D_DESIGN...').
+        """
+        return cls._SCHEMA_ID_RE.search(schema.upper()) is not None
+    
+    def bom_statistics(self):
+        """Statistiques de validation de la BOM, tenues à jour pendant sa construction
+        
+        Returns:
+            Tuple (nombre de composants sans nom, profondeur maximale,
+                   dict nom -> occurrences des noms dupliqués)
+        """
+        duplicates = {name: count for name, count in self._name_counter.items() if count > 1}
+        return self._unnamed_count, self._max_level, duplicates
+    
+    @property
+    def colors_registry(self):
+        """Couleurs par entry : {entry: {'name': ..., 'rgb': [r, g, b]}}"""
+        return {
+            entry: {'name': name, 'rgb': rgb}
+            for entry, name, rgb in zip(self.color_entries, self.color_names, self.color_rgb.tolist())
+        }
+    
+    def geometry_totals(self):
+        """Volume et surface cumulés de tous les composants analysés
+        
+        Returns:
+            Tuple (volume total en mm³, surface totale en mm²)
+        """
+        self._ensure_geometry_arrays()
+        table = self._props_table
+        return float(table['volume'].sum()), float(table['surface_area'].sum())
+    
+    def _analyze_one(self, task, with_surface=True):
+        """Calcule les propriétés d'un seul composant (exécuté dans un thread)
+        
+        Args:
+            task: tuple (label, entry) du composant à analyser
+            with_surface: si False, la surface n'est pas calculée
         
-        simple_name = label.GetLabelName()
+        Returns:
+            Tuple (entry, nom, propriétés ou None, avertissement ou None)
+        """
+        label, entry = task
+        simple_name = self._label_name(label, entry)
         shape = self.shape_tool.GetShape(label)
         
         if shape.IsNull():
-            if not self.silent:
-                self._log(f"  Warning: Shape nulle pour {simple_name} (entry: {entry})")
-            return
+            return entry, simple_name, None, f"  Warning: Shape nulle pour {simple_name} (entry: {entry})"
         
-        try:
-            # 1. Volume
-            props = GProp_GProps()
-            brepgprop.VolumeProperties(shape, props)
-            volume = props.Mass()
-            
-            # 2. Surface area
-            props_surface = GProp_GProps()
-            brepgprop.SurfaceProperties(shape, props_surface)
-            surface_area = props_surface.Mass()
-            
-            # 3. Center of gravity
-            cog = props.CentreOfMass()
-            
-            # 4. Bounding Box
-            bbox_data = self._get_bounding_box(shape)
-            bbox_str = f"{bbox_data['dims'][0]}x{bbox_data['dims'][1]}x{bbox_data['dims'][2]}"
-            
-            # 5. Topologie (Trous & Faces)
-            features = {}
-            try:
-                exp = TopExp_Explorer(shape, TopAbs_FACE)
-                if exp.More():
-                    features = self._extract_geometric_features(shape)
-            except Exception as e:
-                if not self.silent:
-                    self._log(f"  Warning: Erreur analyse topo sur {simple_name}: {e}")
-
-            # Résumé log
-            holes_summary = ""
-            if features.get('holes'):
-                count = len(features['holes'])
-                holes_summary = f"{count} trous"
-            
-            self.geometric_props[entry] = {
-                'name': simple_name,
-                'volume': volume,
-                'surface_area': surface_area,
-                'center_of_gravity': [cog.X(), cog.Y(), cog.Z()],
-                'bbox': bbox_data,
-                'features_signature': features
-            }
-            
-            self._log(f"  {simple_name:<30} {bbox_str:<25} {holes_summary}")
-            
-        except Exception as e:
-            if not self.silent:
-                self._log(f"  Erreur lors de l'analyse de {simple_name}: {e}")
-
-
-    def build_component_path(self, label):
-        """Construit le chemin hiérarchique complet d'un composant
+        return self._component_result(
+            entry, simple_name, _shape_props(shape, with_surface, self.silent)
+        )
+    
+    def _analyze_in_processes(self, tasks, with_surface):
+        """Calcule les propriétés des composants sur un pool de processus
         
-        Retourne une chaîne du type: "assembly > sub_assembly > part"
-        pour identifier de manière unique chaque composant même avec nom dupliqué.
+        Les labels restent dans ce processus : seules les formes des pièces
+        (sérialisées) sont transmises aux workers. Les assemblages, dont la BRep
+        contient tout le sous-arbre, sont calculés ici.
+        
+        Returns:
+            Liste de tuples (entry, nom, propriétés ou None, avertissement ou None)
         """
-        entry = self.get_entry(label)
-        path_parts = []
+        results = [None] * len(tasks)
+        jobs, shapes = [], []
+        for k, (label, entry) in enumerate(tasks):
+            if self._is_assembly(label, entry):
+                results[k] = self._analyze_one((label, entry), with_surface)
+                continue
+            simple_name = self._label_name(label, entry)
+            shape = self.shape_tool.GetShape(label)
+            if shape.IsNull():
+                results[k] = (entry, simple_name, None,
+                              f"  Warning: Shape nulle pour {simple_name} (entry: {entry})")
+                continue
+            jobs.append((k, entry, simple_name))
+            shapes.append(shape)
+        
+        # 'spawn' : pas de fork d'un processus multi-thread (serveur MCP, pool de threads)
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            outcomes = executor.map(_shape_props, shapes, repeat(with_surface), repeat(self.silent),
+                                    chunksize=max(1, len(shapes) // (4 * (os.cpu_count() or 1))))
+            for (k, entry, simple_name), outcome in zip(jobs, outcomes):
+                results[k] = self._component_result(entry, simple_name, outcome)
+        
+        return results
+    
+    def _component_result(self, entry, simple_name, outcome):
+        """Met en forme le résultat de _shape_props pour un composant"""
+        props, topo_error, error = outcome
+        if error is not None:
+            return entry, simple_name, None, f"  Erreur lors de l'analyse de {simple_name}: {error}"
         
-        # Trouver le composant dans la BOM et remonter la hiérarchie
-        bom_dict = {item['label_entry']: item for item in self.bom}
+        warning = None
+        if topo_error is not None:
+            warning = f"  Warning: Erreur analyse topo sur {simple_name}: {topo_error}"
         
-        if entry in bom_dict:
-            current_item = bom_dict[entry]
-            path_parts.insert(0, current_item['name'])
-            
-            # Trouver les parents en cherchant les niveaux inférieurs
-            current_level = current_item['level']
-            current_pos = current_item['position']
-            
-            # Parcourir la BOM en arrière pour trouver les parents
-            for i in range(current_pos - 1, 0, -1):
-                if i <= len(self.bom):
-                    parent_item = self.bom[i-1]
-                    if parent_item['level'] < current_level:
-                        path_parts.insert(0, parent_item['name'])
-                        current_level = parent_item['level']
-                        if current_level == 0:
-                            break
-        
-        return " > ".join(path_parts) if path_parts else label.GetLabelName()
-    
+        return entry, simple_name, {'name': simple_name, **props}, warning
+
+
     def add_unique_names_to_geometry(self):
         """Ajoute les noms uniques et chemins aux propriétés géométriques"""
-        # Créer un mapping entry -> label
-        labels = TDF_LabelSequence()
-        self.shape_tool.GetShapes(labels)
-        label_map = {}
-        for i in range(labels.Length()):
-            label = labels.Value(i+1)
-            if not label.IsNull():
-                entry = self.get_entry(label)
-                label_map[entry] = label
+        label_map = self._ensure_label_map()
         
         # Compter les occurrences de chaque nom
         name_counts = defaultdict(int)
@@ -485,6 +1041,7 @@ class ConfigurationManager:
                     props['path'] = self.build_component_path(label)
 
     
+    @_log_phase
     def analyze_interfaces(self):
         """Analyse les interfaces et liaisons entre composants
         
@@ -500,31 +1057,47 @@ class ConfigurationManager:
         self._log("ANALYSE DES INTERFACES")
         self._log("="*80)
         
-        # S'assurer que la géométrie est analysée
+        # S'assurer que la géométrie est analysée (la surface n'est pas utilisée ici)
         if not self.geometric_props:
-            self.analyze_geometry()
+            self.analyze_geometry(with_surface=False)
         
         interfaces = []
         components_list = list(self.geometric_props.items())
         
         self._log(f"\nAnalyse de {len(components_list)} composants...")
         
-        # Comparer chaque paire de composants
-        for i in range(len(components_list)):
+        self._ensure_geometry_arrays()
+        bbox_max = self._bbox_max
+        
+        # Pré-filtrage spatial : seules les paires proches sont comparées
+        pairs = _candidate_pairs(self._pair_centres, self._pair_radii)
+        ancestors = self._bom_ancestors()
+        no_ancestors = frozenset()
+        
+        # Tailles de référence de toutes les paires en une passe
+        if pairs:
+            idx = np.asarray(pairs)
+            max_sizes = np.maximum(bbox_max[idx[:, 0]], bbox_max[idx[:, 1]])
+        
+        # Comparer chaque paire de composants candidate
+        for k, (i, j) in enumerate(pairs):
             entry1, comp1 = components_list[i]
+            entry2, comp2 = components_list[j]
             
-            for j in range(i + 1, len(components_list)):
-                entry2, comp2 = components_list[j]
-                
-                # Ignorer si même composant ou si l'un est l'assemblage racine
-                if entry1 == entry2:
-                    continue
-                
-                # Analyser l'interface entre comp1 et comp2
-                interface = self._analyze_component_pair(entry1, comp1, entry2, comp2)
-                
-                if interface:
-                    interfaces.append(interface)
+            # Ignorer si même composant ou si l'un contient l'autre (racine ou
+            # sous-assemblage : sa bbox englobe toujours celles de ses descendants)
+            if entry1 == entry2 or entry1 in ancestors.get(entry2, no_ancestors) \
+                    or entry2 in ancestors.get(entry1, no_ancestors):
+                continue
+            
+            # Analyser l'interface entre comp1 et comp2
+            interface = self._analyze_component_pair(
+                entry1, comp1, entry2, comp2,
+                max_bbox_size=float(max_sizes[k])
+            )
+            
+            if interface:
+                interfaces.append(interface)
         
         self.interfaces = interfaces
         
@@ -532,7 +1105,6 @@ class ConfigurationManager:
         self._log(f"\n  Total interfaces détectées: {len(interfaces)}")
         
         # Grouper par type
-        from collections import Counter
         type_counts = Counter(iface['type'] for iface in interfaces)
         
         for iface_type, count in type_counts.items():
@@ -548,9 +1120,12 @@ class ConfigurationManager:
         
         return interfaces
     
-    def _analyze_component_pair(self, entry1, comp1, entry2, comp2):
+    def _analyze_component_pair(self, entry1, comp1, entry2, comp2, max_bbox_size=None):
         """Analyse l'interface entre deux composants
         
+        Args:
+            max_bbox_size: plus grande dimension de bbox de la paire si déjà calculée
+        
         Returns:
             Dictionnaire décrivant l'interface ou None si pas d'interface
         """
@@ -564,24 +1139,52 @@ class ConfigurationManager:
         if not bbox1 or not bbox2:
             return None
         
-        # Distance entre centres (approximation rapide)
-        cog1 = comp1.get('center_of_gravity', [0, 0, 0])
-        cog2 = comp2.get('center_of_gravity', [0, 0, 0])
+        if max_bbox_size is None:
+            max_bbox_size = max(bbox1['dims'] + bbox2['dims'])
         
-        distance = ((cog1[0] - cog2[0])**2 + 
-                   (cog1[1] - cog2[1])**2 + 
-                   (cog1[2] - cog2[2])**2)**0.5
+        extent1 = bbox1.get('extent')
+        extent2 = bbox2.get('extent')
+        distance = None
         
-        # Si trop éloignés, pas d'interface
-        max_bbox_size = max(bbox1['dims'] + bbox2['dims'])
-        if distance > max_bbox_size * 2:
-            return None
+        if extent1 and extent2:
+            # Test de recouvrement AABB : distance = écart entre les boîtes
+            gap = _aabb_separation(extent1, extent2)
+            
+            # Si trop éloignés, pas d'interface
+            if gap > max_bbox_size:
+                return None
+            
+            distance = max(gap, 0.0)
+            in_contact = gap <= _CONTACT_GAP
+            in_proximity = gap < max_bbox_size * 0.3
+        else:
+            # Repli (baselines sans 'extent') : distance au carré entre centres,
+            # la racine n'est calculée que pour l'affichage
+            cog1 = comp1.get('center_of_gravity', [0, 0, 0])
+            cog2 = comp2.get('center_of_gravity', [0, 0, 0])
+            
+            dx = cog1[0] - cog2[0]
+            dy = cog1[1] - cog2[1]
+            dz = cog1[2] - cog2[2]
+            distance_sq = dx*dx + dy*dy + dz*dz
+            
+            # Si trop éloignés, pas d'interface
+            max_sq = max_bbox_size * max_bbox_size
+            if distance_sq > 4 * max_sq:
+                return None
+            
+            in_contact = distance_sq < 0.09 * max_sq
+            in_proximity = distance_sq < max_sq
         
         # 2. Analyser les trous pour détecter les fixations
         holes1 = comp1.get('features_signature', {}).get('holes', [])
         holes2 = comp2.get('features_signature', {}).get('holes', [])
         
-        aligned_holes = self._find_aligned_holes(holes1, holes2)
+        aligned_holes = self._find_aligned_holes(
+            holes1, holes2,
+            arr1=self._holes_array(entry1, holes1),
+            arr2=self._holes_array(entry2, holes2)
+        )
         
         if aligned_holes:
             # Interface de type vissage/boulonnage
@@ -612,9 +1215,14 @@ class ConfigurationManager:
                 'description': f"{len(aligned_holes)} fixation(s) Ø{main_diameter}mm"
             }
         
+        if not (in_contact or in_proximity):
+            return None
+        if distance is None:
+            distance = distance_sq ** 0.5
+        
         # 3. Si composants proches mais pas de trous alignés
         # Vérifier si surfaces potentiellement en contact
-        if distance < max_bbox_size * 0.3:
+        if in_contact:
             # Contact ou encastrement probable
             return {
                 'type': 'contact',
@@ -628,130 +1236,83 @@ class ConfigurationManager:
             }
         
         # 4. Proximité sans contact direct
-        if distance < max_bbox_size:
-            return {
-                'type': 'proximity',
-                'component1': name1,
-                'component2': name2,
-                'entry1': entry1,
-                'entry2': entry2,
-                'distance': round(distance, 2),
-                'severity': 'minor',
-                'description': f"Proximité (distance: {distance:.1f}mm)"
-            }
-        
-        return None
+        return {
+            'type': 'proximity',
+            'component1': name1,
+            'component2': name2,
+            'entry1': entry1,
+            'entry2': entry2,
+            'distance': round(distance, 2),
+            'severity': 'minor',
+            'description': f"Proximité (distance: {distance:.1f}mm)"
+        }
+    
+    def _holes_array(self, entry, holes):
+        """Retourne (et met en cache) les trous d'un composant en tableau (N, 4) [d, x, y, z]"""
+        arr = self._holes_arrays.get(entry)
+        if arr is None:
+            arr = np.array(
+                [[h['d'], h['x'], h['y'], h['z']] for h in holes],
+                dtype=np.float64
+            ).reshape(-1, 4)
+            self._holes_arrays[entry] = arr
+        return arr
     
-    def _find_aligned_holes(self, holes1, holes2, tolerance=2.0):
+    def _find_aligned_holes(self, holes1, holes2, tolerance=2.0, arr1=None, arr2=None):
         """Trouve les paires de trous alignés entre deux composants
         
         Args:
             holes1: Liste des trous du composant 1
             holes2: Liste des trous du composant 2
             tolerance: Tolérance d'alignement en mm (défaut: 2mm)
+            arr1, arr2: Trous sous forme de tableaux (N, 4) [d, x, y, z]
+                        (construits à partir des listes si absents)
         
         Returns:
             Liste de tuples (trou1, trou2) pour les trous alignés
         """
-        aligned = []
+        if not holes1 or not holes2:
+            return []
         
-        for h1 in holes1:
-            for h2 in holes2:
-                # Vérifier si même diamètre (±0.1mm)
-                if abs(h1['d'] - h2['d']) > 0.1:
-                    continue
-                
-                # Vérifier alignement spatial
-                # Les trous doivent être alignés sur au moins 2 axes
-                dx = abs(h1['x'] - h2['x'])
-                dy = abs(h1['y'] - h2['y'])
-                dz = abs(h1['z'] - h2['z'])
-                
-                # Compter les axes alignés
-                aligned_axes = sum([dx < tolerance, dy < tolerance, dz < tolerance])
-                
-                # Si au moins 2 axes alignés (trous traversants ou coaxiaux)
-                if aligned_axes >= 2:
-                    # Distance 3D totale
-                    dist_3d = (dx**2 + dy**2 + dz**2)**0.5
-                    
-                    # Si distance totale raisonnable
-                    if dist_3d < tolerance * 2:
-                        aligned.append((h1, h2))
-                        break  # Éviter doublons
+        if arr1 is None:
+            arr1 = np.array([[h['d'], h['x'], h['y'], h['z']] for h in holes1], dtype=np.float64)
+        if arr2 is None:
+            arr2 = np.array([[h['d'], h['x'], h['y'], h['z']] for h in holes2], dtype=np.float64)
         
-        return aligned
-
-
-    def _get_bounding_box(self, shape):
-            """Calcule la boîte englobante pour l'analyse d'encombrement (Clash Detection)"""
-            bbox = Bnd_Box()
-            brepbndlib.Add(shape, bbox)
-            xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
-            return {
-                'dims': [round(xmax-xmin, 2), round(ymax-ymin, 2), round(zmax-zmin, 2)],
-                'volume_bbox': round((xmax-xmin)*(ymax-ymin)*(zmax-zmin), 2)
-            }
-
-    def _extract_geometric_features(self, shape):
-            """
-            Extrait les signatures topologiques avec localisation spatiale.
-            Retourne : { 'holes': [{'d': 3.0, 'x': 10.0, 'y': 5.0, ...}], 'planar_faces': n }
-            """
-            features = {
-                'holes': [], 
-                'planar_faces_count': 0
-            }
-            
-            try:
-                explorer = TopExp_Explorer(shape, TopAbs_FACE)
-                while explorer.More():
-                    try:
-                        face = explorer.Current()
-                        surf = BRepAdaptor_Surface(face, True)
-                        type_surf = surf.GetType()
-                        
-                        if type_surf == GeomAbs_Cylinder:
-                            cyl = surf.Cylinder()
-                            radius = cyl.Radius()
-                            loc = cyl.Location()
-                            
-                            # On stocke le Diamètre ET la Position (arrondis pour la stabilité)
-                            # C'est la clé de la gestion d'assemblage : savoir OÙ est le trou.
-                            features['holes'].append({
-                                'd': round(radius * 2.0, 3), # Diamètre
-                                'x': round(loc.X(), 1),
-                                'y': round(loc.Y(), 1),
-                                'z': round(loc.Z(), 1)
-                            })
-                        
-                        elif type_surf == GeomAbs_Plane:
-                            features['planar_faces_count'] += 1
-                    except Exception as e:
-                        # Skip face if error, but continue processing
-                        if not self.silent:
-                            print(f"    Warning: Error processing face: {e}")
-                        pass
-                        
-                    explorer.Next()
-                    
-                # Tri pour garantir l'ordre déterministe (par diamètre puis position X)
-                features['holes'].sort(key=lambda k: (k['d'], k['x'], k['y']))
-            except Exception as e:
-                if not self.silent:
-                    print(f"    Warning: Error extracting features: {e}")
-                
-            return features
+        if _aligned_holes_nb is not None:
+            pairs = _aligned_holes_nb(arr1, arr2, float(tolerance))
+            return [(holes1[i], holes2[j]) for i, j in pairs]
+        
+        # Toutes les combinaisons (trou1, trou2) en une passe
+        # Même diamètre (±0.1mm)
+        dia_ok = np.abs(arr1[:, None, 0] - arr2[None, :, 0]) <= 0.1
+        
+        # Alignement spatial : au moins 2 axes alignés (trous traversants ou coaxiaux)
+        diff = np.abs(arr1[:, None, 1:] - arr2[None, :, 1:])
+        aligned_axes = (diff < tolerance).sum(axis=-1)
+        
+        # Distance 3D totale raisonnable
+        dist_ok = np.linalg.norm(diff, axis=-1) < tolerance * 2
+        
+        mask = dia_ok & (aligned_axes >= 2) & dist_ok
+        
+        # Premier partenaire pour chaque trou1 (évite les doublons)
+        first = mask.argmax(axis=1)
+        return [(holes1[i], holes2[first[i]]) for i in np.flatnonzero(mask.any(axis=1))]
+    
+    @_log_phase
     def extract_colors(self):
         """Extrait les couleurs des composants"""
         self._log("\n" + "="*80)
         self._log("4. EXTRACTION DES COULEURS")
         self._log("="*80)
         
-        labels = TDF_LabelSequence()
+        labels = self._scratch_seq
+        labels.Clear()
         self.shape_tool.GetShapes(labels)
+        color = self._scratch_color
         
-        color_found = False
+        entries, names, rgb_buf = [], [], bytearray()
         
         self._log(f"\n  {'Composant':<40} {'Couleur RGB':<20}")
         self._log("  " + "-"*60)
@@ -761,54 +1322,63 @@ class ConfigurationManager:
             if label.IsNull():
                 continue
             
-            name = label.GetLabelName()
-            color = Quantity_Color()
+            entry = self.get_entry(label)
+            name = self._label_name(label, entry)
             
-            # Try to get color (simple form without color type)
+            # Try to get color (simple form without color type) : GetColor renvoie
+            # False sans lever d'exception pour un label sans couleur
             try:
                 if self.color_tool.GetColor(label, color):
-                    r, g, b = int(color.Red()*255), int(color.Green()*255), int(color.Blue()*255)
-                    color_str = f"({r}, {g}, {b})"
-                    self._log(f"  {name:<40} {color_str:<20}")
+                    # Une seule traversée vers OCC pour les trois composantes
+                    red, green, blue = color.Values(Quantity_TOC_RGB)
+                    r, g, b = int(red*255), int(green*255), int(blue*255)
+                    self._log_lazy(lambda: f"  {name:<40} {str((r, g, b)):<20}")
                     
-                    self.colors_registry[self.get_entry(label)] = {
-                        'name': name,
-                        'rgb': [r, g, b]
-                    }
-                    color_found = True
-            except:
-                # Try with shape if label method fails
-                try:
-                    shape = self.shape_tool.GetShape(label)
-                    if not shape.IsNull():
-                        # Colors might be on the shape
-                        pass
-                except:
-                    pass
-        
-        if not color_found:
+                    entries.append(entry)
+                    names.append(name)
+                    rgb_buf.extend((r, g, b))
+            except RuntimeError as e:
+                # Erreur OCC (Standard_Failure traduite par pythonocc) : label ignoré
+                self._log(f"  Warning: Couleur illisible pour {name}: {e}")
+        
+        self.color_entries = entries
+        self.color_names = names
+        self.color_rgb = np.frombuffer(rgb_buf, dtype=np.uint8).reshape(-1, 3)
+        
+        if not entries:
             self._log("  Aucune couleur définie dans le fichier STEP")
     
+    @_log_phase
     def build_dependency_graph(self):
         """Construit le graphe de dépendances"""
         self._log("\n" + "="*80)
         self._log("5. GRAPHE DE DÉPENDANCES")
         self._log("="*80)
         
-        labels = TDF_LabelSequence()
-        self.shape_tool.GetShapes(labels)
-        
-        for i in range(labels.Length()):
-            label = labels.Value(i+1)
-            if label.IsNull() or not self.shape_tool.IsAssembly(label):
-                continue
-            
+        # Parcours en profondeur depuis les formes libres (racines) : seuls les
+        # assemblages sont empilés, les pièces ne donnent qu'une arête
+        roots = TDF_LabelSequence()
+        self.shape_tool.GetFreeShapes(roots)
+        comps = self._scratch_comps
+        
+        stack = []
+        for i in range(roots.Length() - 1, -1, -1):
+            root = roots.Value(i+1)
+            if not root.IsNull() and self._is_assembly(root, self.get_entry(root)):
+                stack.append(root)
+        visited = set()
+        
+        while stack:
+            label = stack.pop()
             parent_entry = self.get_entry(label)
-            parent_name = label.GetLabelName()
+            if parent_entry in visited:
+                continue
+            visited.add(parent_entry)
             
-            comps = TDF_LabelSequence()
+            comps.Clear()
             self.shape_tool.GetComponents(label, comps, False)
             
+            children = []
             for j in range(comps.Length()):
                 c_label = comps.Value(j+1)
                 if c_label.IsNull():
@@ -817,51 +1387,68 @@ class ConfigurationManager:
                 ref_label = TDF_Label()
                 if self.shape_tool.GetReferredShape(c_label, ref_label) and not ref_label.IsNull():
                     child_entry = self.get_entry(ref_label)
-                    child_name = ref_label.GetLabelName()
+                    child_name = self._label_name(ref_label, child_entry)
                     
-                    self.dependency_graph[parent_entry].append({
-                        'entry': child_entry,
-                        'name': child_name
-                    })
+                    self.dependency_graph[parent_entry].append(
+                        DependencyChild(child_entry, child_name)
+                    )
+                    if child_entry not in visited and self._is_assembly(ref_label, child_entry):
+                        children.append(ref_label)
+            
+            # Sous-assemblages visités dans l'ordre des composants
+            stack.extend(reversed(children))
         
-        # Print graph
+        # Print graph (rien à formater en mode silencieux)
+        if self.silent:
+            return
         self._log("\n  Structure des dépendances:")
         for parent, children in self.dependency_graph.items():
             parent_name = self.get_name_from_entry(parent)
             self._log(f"\n  {parent_name} [{parent}]")
             for child in children:
-                self._log(f"    └─ {child['name']} [{child['entry']}]")
+                self._log(f"    └─ {child.name} [{child.entry}]")
+    
+    def dependencies_as_dict(self):
+        """Graphe de dépendances au format sérialisable {parent: [{'entry', 'name'}, ...]}"""
+        return {
+            parent: [child._asdict() for child in children]
+            for parent, children in self.dependency_graph.items()
+        }
     
+    @_log_phase
     def create_configuration_baseline(self):
         """Crée une baseline de configuration"""
         self._log("\n" + "="*80)
         self._log("6. BASELINE DE CONFIGURATION")
         self._log("="*80)
         
+        # Un seul instant pour l'ID et l'horodatage de la baseline
+        now = datetime.now()
         baseline = {
-            'baseline_id': self.generate_config_id(),
-            'timestamp': datetime.now().isoformat(),
+            'baseline_id': self.generate_config_id(now),
+            'timestamp': now.isoformat(),
             'file': self.fname,
             'metadata': self.metadata,
             'bom': self.bom,
             'component_registry': self.components_registry,
             'geometric_properties': self.geometric_props,
             'colors': self.colors_registry,
-            'dependencies': dict(self.dependency_graph),
-            'checksum': self.calculate_file_checksum()
+            'dependencies': self.dependencies_as_dict(),
+            'checksum': self.calculate_file_checksum(),
+            'checksum_algo': self.checksum_algo
         }
         
         # Save to JSON
         baseline_filename = f"config_baseline_{baseline['baseline_id']}.json"
-        with open(baseline_filename, 'w', encoding='utf-8') as f:
-            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        _write_json(baseline_filename, baseline)
         
         self._log(f"\n  Baseline ID: {baseline['baseline_id']}")
         self._log(f"  Date: {baseline['timestamp']}")
-        self._log(f"  Checksum fichier: {baseline['checksum']}")
+        self._log(f"  Checksum fichier ({baseline['checksum_algo']}): {baseline['checksum']}")
         self._log(f"  Nombre de composants: {len(self.bom)}")
         self._log(f"  ✓ Baseline sauvegardée: {baseline_filename}")
     
+    @_log_phase
     def perform_validation_checks(self):
         """Effectue les vérifications de validation"""
         self._log("\n" + "="*80)
@@ -871,10 +1458,11 @@ class ConfigurationManager:
         issues = []
         warnings = []
         
+        unnamed, max_depth, duplicates = self.bom_statistics()
+        
         # Check 1: Tous les composants ont un nom
-        unnamed = [item for item in self.bom if not item['name'] or item['name'].strip() == '']
         if unnamed:
-            issues.append(f"Composants sans nom: {len(unnamed)}")
+            issues.append(f"Composants sans nom: {unnamed}")
         else:
             self._log("  ✓ Tous les composants ont un nom")
         
@@ -885,15 +1473,13 @@ class ConfigurationManager:
             self._log("  ✓ Métadonnées présentes")
         
         # Check 3: Schema STEP valide
-        valid_schemas = ['CONFIG_CONTROL_DESIGN', 'AUTOMOTIVE_DESIGN', 'AP203', 'AP214']
         schema = self.metadata.get('schema', '')
-        if any(s in schema for s in valid_schemas):
+        if self.is_valid_schema(schema):
             self._log(f"  ✓ Schéma STEP valide: {schema}")
         else:
             warnings.append(f"Schéma STEP non standard: {schema}")
         
         # Check 4: Hiérarchie non excessive
-        max_depth = max([item['level'] for item in self.bom]) if self.bom else 0
         if max_depth > 10:
             warnings.append(f"Hiérarchie profonde: {max_depth} niveaux")
         else:
@@ -906,10 +1492,6 @@ class ConfigurationManager:
             warnings.append("Propriétés géométriques non disponibles")
         
         # Check 6: Duplicate component names
-        name_counts = defaultdict(int)
-        for item in self.bom:
-            name_counts[item['name']] += 1
-        duplicates = {name: count for name, count in name_counts.items() if count > 1}
         if duplicates:
             warnings.append(f"Noms dupliqués détectés: {len(duplicates)}")
             self._log(f"  ⚠ Composants avec noms identiques: {len(duplicates)}")
@@ -935,17 +1517,33 @@ class ConfigurationManager:
                 for warning in warnings:
                     self._log(f"    • {warning}")
     
-    def generate_config_id(self):
-        """Génère un ID de configuration unique"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_hash = hashlib.md5(self.fname.encode()).hexdigest()[:8]
-        return f"CFG_{timestamp}_{file_hash}"
+    def generate_config_id(self, now=None):
+        """Génère un ID de configuration unique
+        
+        Args:
+            now: instant à utiliser (datetime.now() par défaut)
+        """
+        if now is None:
+            now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        return f"CFG_{timestamp}_{self._fname_hash8}"
     
     def calculate_file_checksum(self):
-        """Calcule le checksum du fichier"""
-        sha256_hash = hashlib.sha256()
-        with open(self.fname, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+        """Calcule le checksum du fichier (algorithme : self.checksum_algo)"""
+        if self.checksum_algo == 'blake3':
+            # Arbre de Merkle haché en parallèle sur le fichier projeté en mémoire
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(self.fname)
+            return hasher.hexdigest()
+        
+        with open(self.fname, "rb", buffering=0) as f:
+            # Python >= 3.11 : boucle de lecture en C, sans objets bytes intermédiaires
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            
+            # Lecture non bufferisée par gros blocs : peu d'itérations Python par Go
+            sha256_hash = hashlib.sha256()
+            for byte_block in iter(lambda: f.read(_CHECKSUM_CHUNK), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
     
@@ -953,14 +1551,49 @@ class ConfigurationManager:
         """Get label entry as string"""
         entry = TCollection_AsciiString()
         TDF_Tool.Entry(label, entry)
-        return entry.ToCString() if entry.ToCString() else ""
+        return entry.ToCString() or ""
+    
+    def _ensure_label_map(self):
+        """Retourne le mapping entry -> label, construit au premier appel
+        
+        La séquence source est conservée : les labels du mapping y font référence.
+        """
+        if self._label_map is not None:
+            return self._label_map
+        
+        self._label_seq = TDF_LabelSequence()
+        self.shape_tool.GetShapes(self._label_seq)
+        
+        label_map = {}
+        for i in range(self._label_seq.Length()):
+            label = self._label_seq.Value(i+1)
+            if not label.IsNull():
+                label_map[self.get_entry(label)] = label
+        
+        self._label_map = label_map
+        return label_map
+    
+    def _is_assembly(self, label, entry=None):
+        """IsAssembly mémorisé par entry de label (entry passée si déjà connue)"""
+        if entry is None:
+            entry = self.get_entry(label)
+        is_assy = self._is_assy.get(entry)
+        if is_assy is None:
+            is_assy = self._is_assy[entry] = self.shape_tool.IsAssembly(label)
+        return is_assy
+    
+    def _label_name(self, label, entry=None):
+        """GetLabelName mémorisé par entry de label (entry passée si déjà connue)"""
+        if entry is None:
+            entry = self.get_entry(label)
+        name = self._name_cache.get(entry)
+        if name is None:
+            name = self._name_cache[entry] = label.GetLabelName()
+        return name
     
     def get_name_from_entry(self, entry_str):
         """Get component name from entry"""
-        for item in self.bom:
-            if item['label_entry'] == entry_str:
-                return item['name']
-        return "Unknown"
+        return self._entry_to_name.get(entry_str, "Unknown")
     
     def build_component_path(self, label):
         """Construit le chemin hiérarchique complet d'un composant
@@ -969,30 +1602,42 @@ class ConfigurationManager:
         pour identifier de manière unique chaque composant même avec nom dupliqué.
         """
         entry = self.get_entry(label)
-        path_parts = []
+        
+        path = self._path_cache.get(entry)
+        if path is not None:
+            return path
         
         # Trouver le composant dans la BOM et remonter la hiérarchie
-        bom_dict = {item['label_entry']: item for item in self.bom}
+        index = self._bom_index.get(entry)
+        if index is None:
+            return self._label_name(label, entry)
         
-        if entry in bom_dict:
-            current_item = bom_dict[entry]
-            path_parts.insert(0, current_item['name'])
-            
-            # Trouver les parents en cherchant les niveaux inférieurs
-            current_level = current_item['level']
-            current_pos = current_item['position']
-            
-            # Parcourir la BOM en arrière pour trouver les parents
-            for i in range(current_pos - 1, 0, -1):
-                if i <= len(self.bom):
-                    parent_item = self.bom[i-1]
-                    if parent_item['level'] < current_level:
-                        path_parts.insert(0, parent_item['name'])
-                        current_level = parent_item['level']
-                        if current_level == 0:
-                            break
-        
-        return " > ".join(path_parts) if path_parts else label.GetLabelName()
+        bom = self.bom
+        path_parts = []
+        while index >= 0:
+            path_parts.append(bom[index]['name'])
+            index = self._bom_parent[index]
+        
+        path = " > ".join(reversed(path_parts))
+        self._path_cache[entry] = path
+        return path
+    
+    def _bom_ancestors(self):
+        """Entries des assemblages qui contiennent chaque entry de la BOM
+        
+        Returns:
+            Dict {entry: set des entries de ses parents, toutes occurrences confondues}
+        """
+        bom = self.bom
+        parents = self._bom_parent
+        ancestors = defaultdict(set)
+        for index, item in enumerate(bom):
+            found = ancestors[item['label_entry']]
+            parent = parents[index]
+            while parent >= 0:
+                found.add(bom[parent]['label_entry'])
+                parent = parents[parent]
+        return ancestors
     
     def get_unique_component_name(self, label, entry):
         """Génère un nom unique pour un composant
@@ -1000,37 +1645,31 @@ class ConfigurationManager:
         Utilise le chemin hiérarchique si des doublons existent,
         sinon retourne le nom simple.
         """
-        name = label.GetLabelName()
-        
-        # Compter les occurrences de ce nom dans la BOM
-        name_count = sum(1 for item in self.bom if item['name'] == name)
+        name = self._label_name(label, entry)
         
-        if name_count > 1:
+        # Occurrences de ce nom dans la BOM (compteur tenu par _add_bom_item)
+        if self._name_counter[name] > 1:
             # Il y a des doublons, utiliser le chemin complet
             return self.build_component_path(label)
         else:
             # Nom unique, retourner tel quel
             return name
     
+    @_log_phase
     def export_to_csv(self):
         """Export BOM to CSV format"""
         import csv
         
-        csv_filename = self.fname.replace('.stp', '_bom.csv')
+        # Remplace seulement l'extension (.stp, .step, .STP...) du nom de fichier
+        step_path = Path(self.fname)
+        csv_filename = str(step_path.with_name(step_path.stem + '_bom.csv'))
         
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as f:
+        # Tampon d'écriture de 1 Mio : peu d'appels write() pour les grosses BOM
+        with open(csv_filename, 'w', buffering=1 << 20, newline='', encoding='utf-8') as f:
             writer = csv.writer(f, delimiter=';')
             writer.writerow(['Position', 'Niveau', 'Quantité', 'Désignation', 'Type', 'Référence'])
             
-            for item in self.bom:
-                writer.writerow([
-                    item['position'],
-                    item['level'],
-                    item['quantity'],
-                    item['name'],
-                    item['type'],
-                    item['label_entry']
-                ])
+            writer.writerows(map(_BOM_CSV_ROW, self.bom))
         
         self._log(f"\n  ✓ BOM exportée: {csv_filename}")
         return csv_filename